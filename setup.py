@@ -3,7 +3,7 @@ from setuptools import setup
 setup(
     name='sfdc-bulk',
     packages=['sfdc_bulk'],
-    version='0.2',
+    version='0.3',
     description='Python client library for SFDC bulk API',
     url='https://github.com/donaldrauscher/sfdc-bulk',
     author='Donald Rauscher',
@@ -12,7 +12,12 @@ setup(
     install_requires=[
         'requests',
         'simple_salesforce',
-        'pandas',
+        'pandas>=2.0',
+        'lxml',
         'pyyaml'
-    ]
+    ],
+    extras_require={
+        'pyarrow': ['pyarrow>=14.0'],
+        'async': ['httpx[http2]']
+    }
 )
@@ -3,3 +3,9 @@ from sfdc_bulk.api import (
     BulkBatchFailed,
     SalesforceBulkAPI
 )
+
+import importlib.util
+
+# the async client needs the optional httpx dependency
+if importlib.util.find_spec("httpx") is not None:
+    from sfdc_bulk.async_api import AsyncSalesforceBulkAPI
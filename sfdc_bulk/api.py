@@ -1,14 +1,32 @@
-import csv, re, time, logging, requests
-import xml.etree.ElementTree as ET
+import csv, re, time, zlib, random, logging, warnings, threading, requests
+from lxml import etree as ET
 import pandas as pd
-from io import StringIO
-from collections import OrderedDict
+from xml.sax.saxutils import escape
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from simple_salesforce import SalesforceLogin
 
+# use pyarrow's multithreaded CSV reader and arrow-backed dtypes when pyarrow is installed
+try:
+    import pyarrow
+    import pyarrow.csv
+    READ_CSV_OPTIONS = {'engine': 'pyarrow', 'dtype_backend': 'pyarrow'}
+except ImportError:
+    pyarrow = None
+    READ_CSV_OPTIONS = {}
+
 
 ERROR_STATES = ('Failed','Not Processed')
 PENDING_STATES = ('InProcess', 'Queued')
-COMPLETED_STATES = ('Completed')
+COMPLETED_STATES = ('Completed',)
+TERMINAL_STATES = COMPLETED_STATES + ERROR_STATES
+
+OPERATIONS = ('query', 'queryAll', 'insert', 'upsert', 'update', 'delete', 'hardDelete')
+JOB_STATES = ('Open', 'Closed', 'Aborted')
+JOB_PARAM_ORDER = ('operation', 'object', 'externalIdFieldName', 'concurrencyMode', 'contentType', 'state')
+
+FROM_RE = re.compile(r"FROM (\w+)", re.I)
 
 
 class BulkApiError(Exception):
@@ -32,12 +50,9 @@ class BulkBatchFailed(Exception):
 class SalesforceBulkAPI(object):
 
     jobNS = 'http://www.force.com/2009/06/asyncapi/dataload'
-    jobs = []
-    job_statuses = {}
-    batches = {}  # dict of job_id => [batch_id, batch_id, ...]
-    batch_statuses = {}
+    id_xpath = ET.XPath("string(job:id)", namespaces={'job': jobNS})
 
-    def __init__(self, username=None, password=None, security_token=None, organization_id=None, sandbox=False, API_version="37.0", batch_size=5000, logger=None, verbose=True):
+    def __init__(self, username=None, password=None, security_token=None, organization_id=None, sandbox=False, API_version="37.0", batch_size=5000, max_workers=8, logger=None, verbose=True):
 
         # use SalesforceLogin from simple_salesforce for authentication
         self.session_id, host = SalesforceLogin(username=username, password=password, security_token=security_token, organizationId=organization_id, sandbox=sandbox)
@@ -48,6 +63,17 @@ class SalesforceBulkAPI(object):
 
         self.batch_size = batch_size
 
+        self.jobs = []
+        self.job_statuses = {}
+        self.batches = {}  # dict of job_id => [batch_id, batch_id, ...]
+        self.batch_statuses = {}
+        self._batch_to_job = {}  # dict of batch_id => job_id
+        self._done_batches = set()
+        self._serial_jobs = set()
+        self._lock = threading.Lock()
+
+        self.open_session(max_workers)
+
         if not logger:
             logger = logging.getLogger(__name__)
             logger.setLevel(logging.DEBUG)
@@ -59,9 +85,31 @@ class SalesforceBulkAPI(object):
                 logger.addHandler(logging.NullHandler())
         self._logger = logger
 
+    def open_session(self, max_workers):
+        # reuse a single session so connections (and TLS handshakes) are pooled across calls;
+        # once retries run out the last response is returned so check_status can raise BulkApiError
+        self._session = requests.Session()
+        retry = Retry(total=5, backoff_factor=0.5, status_forcelist=[500, 502, 503, 504], raise_on_status=False)
+        self._session.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=32, max_retries=retry))
+        self._session.headers.update({"X-SFDC-Session": self.session_id, "Accept-Encoding": "gzip"})
+
+        # status polls and result downloads are independent HTTP calls, so run them concurrently
+        self._executor = ThreadPoolExecutor(max_workers=max_workers)
+
+    def close(self):
+        self._executor.shutdown(wait=True)
+        self._session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
     # some utility functions
     def headers(self, values={}):
-        default = {"X-SFDC-Session": self.session_id, "Content-Type": "application/xml; charset=UTF-8"}
+        # session id is sent by the session; only per-call headers here
+        default = {"Content-Type": "application/xml; charset=UTF-8"}
         for k, val in values.items():
             default[k] = val
         return default
@@ -77,90 +125,185 @@ class SalesforceBulkAPI(object):
             msg = "Bulk API HTTP Error result: %s" % (content)
             self.raise_error(msg, status_code)
 
-    def lookup_job_id(self, batch_id):
-        for job_id in self.batches.keys():
-            if batch_id in self.batches[job_id]:
-                return job_id
+    def add_batches(self, job_id, batch_ids):
+        # keep the batch id => job id index in step with self.batches
+        with self._lock:
+            self.batches[job_id].extend(batch_ids)
+            for batch_id in batch_ids:
+                self._batch_to_job[batch_id] = job_id
 
-        raise Exception("Batch id '%s' is uknown, can't retrieve job_id" % batch_id)
+    def lookup_job_id(self, batch_id):
+        try:
+            return self._batch_to_job[batch_id]
+        except KeyError:
+            raise KeyError("Batch id '%s' is unknown, can't retrieve job_id" % batch_id)
+
+    def read_csv(self, url, as_table=False):
+        # stream the response body straight into pandas (or pyarrow) rather than buffering it as a str
+        with self._session.get(url, headers=self.headers(), stream=True) as req:
+            if req.status_code >= 400:
+                self.check_status(req.status_code, req.text)
+            req.raw.decode_content = True
+            return self.parse_csv(req.raw, as_table)
+
+    def parse_csv(self, source, as_table=False):
+        if as_table:
+            return pyarrow.csv.read_csv(source)
+        return pd.read_csv(source, **READ_CSV_OPTIONS)
+
+    def concat_results(self, results):
+        if pyarrow is None:
+            return pd.concat(results, axis=0)
+
+        # concatenating arrow tables just chains their chunks; convert to pandas once at the end
+        try:
+            table = pyarrow.concat_tables(results, promote_options='permissive')
+        except (pyarrow.ArrowTypeError, pyarrow.ArrowInvalid):
+            # each file's column types are inferred separately and can't always be unified
+            # (e.g. int64 in one file, string in another); let pandas fall back to object columns
+            return pd.concat([t.to_pandas(types_mapper=pd.ArrowDtype) for t in results], axis=0)
+        return table.to_pandas(split_blocks=True, self_destruct=True, types_mapper=pd.ArrowDtype)
 
     def parse_xml(self, xml):
         tree = ET.fromstring(xml)
         result = {}
         for child in tree:
-            result[re.sub("{.*?}", "", child.tag)] = child.text
+            result[ET.QName(child).localname] = child.text
         return result
 
+    def register_batches(self, job_id, contents):
+        # pull the batch ids out of batch creation responses and track them against the job
+        batch_ids = []
+        for i, content in enumerate(contents):
+            batch_id = str(self.id_xpath(ET.fromstring(content)))
+            self._logger.debug("Added batch id %s (#%s) to job id %s..." % (batch_id, i+1, job_id))
+            batch_ids.append(batch_id)
+
+        self.add_batches(job_id, batch_ids)
+        return batch_ids
+
+    def log_status(self, label, obj_id, status):
+        self._logger.debug("Results summary for %s id %s:" % (label, obj_id))
+        for k, v in status.items():
+            self._logger.debug('    %s: %s' % (k, v))
+
     def df_chunks(self, df):
-        chunks = list()
-        n_chunks = len(df) // self.batch_size + 1
-        for i in range(n_chunks):
-            chunks.append(df.loc[i*self.batch_size:(i+1)*self.batch_size,:])
-        return chunks
+        if len(df) == 0:
+            raise ValueError("Can't create batches from an empty DataFrame")
+
+        # positional slices so chunks never overlap or come out empty, whatever the index
+        for i in range(0, len(df), self.batch_size):
+            yield df.iloc[i:i+self.batch_size]
 
     # some methods for monitoring jobs
-    def get_status(self, obj_id, obj_type='job', reload=False):
+    def cached_status(self, obj_id, obj_type, reload):
         if obj_type == 'job':
-            if not reload and obj_id in self.job_statuses:
-                return self.job_statuses[obj_id]
-            url = self.endpoint + "/job/%s" % obj_id
-        else:
-            if not reload and obj_id in self.batch_statuses:
+            if not reload:
+                return self.job_statuses.get(obj_id)
+        elif obj_id in self.batch_statuses:
+            # batch states are final once completed or failed, so those never need reloading
+            if not reload or self.batch_statuses[obj_id]['state'] in TERMINAL_STATES:
                 return self.batch_statuses[obj_id]
-            job_id = self.lookup_job_id(obj_id)
-            url = self.endpoint + "/job/%s/batch/%s" % (job_id, obj_id)
+        return None
 
-        req = requests.get(url, headers=self.headers())
-        self.check_status(req.status_code, req.text)
+    def status_url(self, obj_id, obj_type):
+        if obj_type == 'job':
+            return self.endpoint + "/job/%s" % obj_id
+        return self.endpoint + "/job/%s/batch/%s" % (self.lookup_job_id(obj_id), obj_id)
+
+    def store_status(self, obj_id, obj_type, content):
+        status = self.parse_xml(content)
+        with self._lock:
+            if obj_type == 'batch':
+                self.batch_statuses[obj_id] = status
+            else:
+                self.job_statuses[obj_id] = status
+        return status
 
-        req2 = self.parse_xml(req.text)
-        self.job_statuses[obj_id] = req2
-        return req2
+    def get_status(self, obj_id, obj_type='job', reload=False):
+        status = self.cached_status(obj_id, obj_type, reload)
+        if status is not None:
+            return status
 
-    def is_batch_done(self, batch_id):
-        if batch_id in self.batch_statuses:
-            if self.batch_statuses[batch_id]['state'] in COMPLETED_STATES:
-                self._logger.debug("Batch id %s completed previously." % (batch_id))
-                return True
+        req = self._session.get(self.status_url(obj_id, obj_type), headers=self.headers())
+        self.check_status(req.status_code, req.text)
 
-        batch_status = self.get_status(batch_id, 'batch', reload=True)
+        return self.store_status(obj_id, obj_type, req.content)
+
+    def check_batch_state(self, batch_id, batch_status):
         batch_state = batch_status['state']
 
         if batch_state in ERROR_STATES:
             raise BulkBatchFailed(self.lookup_job_id(batch_id), batch_id, batch_status['stateMessage'], self._logger)
 
         is_complete = batch_state in COMPLETED_STATES
+        if is_complete:
+            self._done_batches.add(batch_id)
 
         self._logger.debug("Batch id %s is %scomplete." % (batch_id, '' if is_complete else 'not '))
 
         return is_complete
 
-    def is_job_done(self, job_id):
+    def is_batch_done(self, batch_id):
+        if batch_id in self._done_batches:
+            self._logger.debug("Batch id %s completed previously." % (batch_id))
+            return True
+
+        return self.check_batch_state(batch_id, self.get_status(batch_id, 'batch', reload=True))
+
+    def pending_batch_ids(self, job_id):
         try:
-            is_completed = True
-            for i, batch_id in enumerate(self.batches[job_id]):
-                self._logger.debug("Checking status of batch id %s... (%s/%s)" % (batch_id, i+1, len(self.batches[job_id])))
-                if not self.is_batch_done(batch_id):
-                    self._logger.debug("Exiting loop.")
-                    is_completed = False
-                    break
-            return is_completed
+            batch_ids = self.batches[job_id]
         except KeyError:
             raise Exception("Job id '%s' does not have any batches!" % job_id)
 
-    def wait_for_batch(self, batch_id, timeout=60*10, sleep_interval=10):
-        waited = 0
-        while not self.is_batch_done(batch_id) and waited < timeout:
-            self._logger.debug("Waiting...")
-            time.sleep(sleep_interval)
-            waited += sleep_interval
+        # only poll batches that haven't been seen completing yet
+        batch_ids = [batch_id for batch_id in batch_ids if batch_id not in self._done_batches]
+        self._logger.debug("Checking status of %s pending batches for job id %s..." % (len(batch_ids), job_id))
+        return batch_ids
 
-    def wait_for_job(self, job_id, timeout=60*60, sleep_interval=30):
-        waited = 0
-        while not self.is_job_done(job_id) and waited < timeout:
-            self._logger.debug("Waiting...")
-            time.sleep(sleep_interval)
-            waited += sleep_interval
+    def is_job_done(self, job_id):
+        futures = [self._executor.submit(self.is_batch_done, batch_id) for batch_id in self.pending_batch_ids(job_id)]
+        results = [f.result() for f in as_completed(futures)]
+        return all(results)
+
+    def pending_batches(self, job_id):
+        # counted from the batch polls is_done() already made, so progress costs no extra request
+        return len([batch_id for batch_id in self.batches[job_id] if batch_id not in self._done_batches])
+
+    def resolve_initial_interval(self, initial_interval, sleep_interval):
+        # sleep_interval is the pre-backoff name for the polling interval
+        if sleep_interval is None:
+            return initial_interval
+        warnings.warn("sleep_interval is deprecated, use initial_interval instead", DeprecationWarning, stacklevel=3)
+        return sleep_interval
+
+    def backoff(self, attempt, pending, last_pending, initial_interval, max_interval):
+        # exponential backoff with jitter; backoff resets whenever more of the job's batches complete
+        if last_pending is not None and pending < last_pending:
+            attempt = 0
+
+        interval = min(max_interval, initial_interval * 2**attempt) * random.uniform(0.8, 1.2)
+        self._logger.debug("Waiting %.1f seconds..." % interval)
+        return attempt + 1, interval
+
+    def wait(self, is_done, job_id, timeout, initial_interval, max_interval):
+        start = time.monotonic()
+        attempt = 0
+        last_pending = None
+        while not is_done() and time.monotonic() - start < timeout:
+            pending = self.pending_batches(job_id)
+            attempt, interval = self.backoff(attempt, pending, last_pending, initial_interval, max_interval)
+            last_pending = pending
+            time.sleep(interval)
+
+    def wait_for_batch(self, batch_id, timeout=60*10, initial_interval=2, max_interval=30, sleep_interval=None):
+        initial_interval = self.resolve_initial_interval(initial_interval, sleep_interval)
+        self.wait(lambda: self.is_batch_done(batch_id), self.lookup_job_id(batch_id), timeout, initial_interval, max_interval)
+
+    def wait_for_job(self, job_id, timeout=60*60, initial_interval=2, max_interval=30, sleep_interval=None):
+        initial_interval = self.resolve_initial_interval(initial_interval, sleep_interval)
+        self.wait(lambda: self.is_job_done(job_id), job_id, timeout, initial_interval, max_interval)
 
 
     # makes a job (query, insert, upsert, update, or delete)
@@ -183,49 +326,51 @@ class SalesforceBulkAPI(object):
         return self.create_job(operation="hardDelete", **kwargs)
 
     def create_job(self, **kwargs):
+        req = self._session.post(self.endpoint + "/job", headers=self.headers(), data=self.new_job_doc(**kwargs))
+        self.check_status(req.status_code, req.text)
+
+        return self.add_job(req.content, **kwargs)
+
+    def new_job_doc(self, **kwargs):
         assert(kwargs['object'] is not None)
         assert(kwargs['operation'] is not None)
         if kwargs['operation'] == 'upsert':
             assert(kwargs['externalIdFieldName'] is not None)
 
-        url = self.endpoint + "/job"
-        doc = self.create_job_doc(**kwargs)
-        req = requests.post(url, headers=self.headers(), data=doc)
-        self.check_status(req.status_code, req.text)
+        return self.create_job_doc(**kwargs)
 
-        job_id = self.parse_xml(req.text)['id']
-        self.jobs.append(job_id)
-        self.batches[job_id] = []
+    def add_job(self, content, **kwargs):
+        job_id = self.parse_xml(content)['id']
+        with self._lock:
+            self.jobs.append(job_id)
+            self.batches[job_id] = []
+            if kwargs.get('concurrencyMode') == 'Serial':
+                self._serial_jobs.add(job_id)
 
         self._logger.debug("Created %s job for %s object.  Job id %s." % (kwargs['operation'], kwargs['object'], job_id))
 
         return job_id
 
     def create_job_doc(self, **kwargs):
-        root = ET.Element("jobInfo")
-        root.set("xmlns", self.jobNS)
+        # catch bad values here rather than paying a round trip for the server to reject them
+        if 'operation' in kwargs and kwargs['operation'] not in OPERATIONS:
+            raise ValueError("Unknown operation '%s'" % kwargs['operation'])
+        if 'state' in kwargs and kwargs['state'] not in JOB_STATES:
+            raise ValueError("Unknown job state '%s'" % kwargs['state'])
 
         # order matters...
-        kwargs_ordered = OrderedDict()
-        param_order = ['operation', 'object', 'externalIdFieldName', 'concurrencyMode', 'contentType']
-        for p1 in [i for i in param_order if i in kwargs.keys()]:
-            kwargs_ordered[p1] = kwargs[p1]
-        for p2 in [i for i in kwargs.keys() if i not in param_order]:
-            kwargs_ordered[p2] = kwargs[p2]
-
-        for key, value in kwargs_ordered.items():
-            child = ET.SubElement(root, key)
-            child.text = value
+        keys = [k for k in JOB_PARAM_ORDER if k in kwargs] + [k for k in kwargs if k not in JOB_PARAM_ORDER]
 
-        doc = ET.tostring(root, encoding="UTF-8")
-        doc = b'<?xml version="1.0" encoding="UTF-8"?>' + doc
-        return doc
+        doc = '<?xml version="1.0" encoding="UTF-8"?><jobInfo xmlns="%s">' % self.jobNS
+        doc += ''.join("<%s>%s</%s>" % (k, escape(str(kwargs[k])), k) for k in keys)
+        doc += '</jobInfo>'
+        return doc.encode('UTF-8')
 
 
     # closes a job
     def close_job(self, job_id):
         url = self.endpoint + "/job/%s" % job_id
-        req = requests.post(url, headers=self.headers(), data=self.create_job_doc(state='Closed'))
+        req = self._session.post(url, headers=self.headers(), data=self.create_job_doc(state='Closed'))
         self.check_status(req.status_code, req.text)
 
         self._logger.debug("Closed job id %s." % (job_id))
@@ -233,7 +378,7 @@ class SalesforceBulkAPI(object):
     # aborts a job
     def abort_job(self, job_id):
         url = self.endpoint + "/job/%s" % job_id
-        req = requests.post(url, headers=self.headers(), data=self.create_job_doc(state='Aborted'))
+        req = self._session.post(url, headers=self.headers(), data=self.create_job_doc(state='Aborted'))
         self.check_status(req.status_code, req.text)
 
         self._logger.debug("Aborted job id %s." % (job_id))
@@ -244,20 +389,16 @@ class SalesforceBulkAPI(object):
 
         self._logger.debug("SOQL query to execute: %s" % (soql))
 
-        job_id = self.create_query_job(object=re.search(re.compile("FROM (\w+)", re.I), soql).group(1), contentType='CSV')
+        job_id = self.create_query_job(object=FROM_RE.search(soql).group(1), contentType='CSV')
 
         url = self.endpoint + "/job/%s/batch" % job_id
-        req = requests.post(url, headers=self.headers({"Content-Type": "text/csv; charset=UTF-8"}), data=soql)
+        req = self._session.post(url, headers=self.headers({"Content-Type": "text/csv; charset=UTF-8"}), data=soql)
         self.check_status(req.status_code, req.text)
 
-        tree = ET.fromstring(req.text)
-        batch_id = tree.findtext("{%s}id" % self.jobNS)
-
-        self._logger.debug("Job id for query is %s. Batch id is %s." % (job_id, batch_id))
+        self.register_batches(job_id, [req.content])
 
         self.close_job(job_id) # can close it out (no more batches being added)
 
-        self.batches[job_id].append(batch_id)
         return job_id
 
     def get_result_ids_for_query(self, job_id):
@@ -265,96 +406,116 @@ class SalesforceBulkAPI(object):
         self.wait_for_batch(batch_id)
 
         url = self.endpoint + "/job/%s/batch/%s/result" % (job_id, batch_id)
-        req = requests.get(url, headers=self.headers())
-        self.check_status(req.status_code, req.text)
 
-        tree = ET.fromstring(req.text)
-        result_ids = [str(x.text) for x in tree.iterfind("{%s}result" % self.jobNS)]
+        # parse result ids incrementally so downloads can start before the whole list is read
+        with self._session.get(url, headers=self.headers(), stream=True) as req:
+            if req.status_code >= 400:
+                self.check_status(req.status_code, req.text)
+            req.raw.decode_content = True
 
-        self._logger.debug("Query result split across %s results: %s." % (len(result_ids), ', '.join(result_ids)))
+            for event, elem in ET.iterparse(req.raw, events=("end",), tag="{%s}result" % self.jobNS):
+                result_id = self.pop_result_id(elem)
+                self._logger.debug("Query result id %s." % (result_id))
+                yield result_id
 
-        return result_ids
+    def pop_result_id(self, elem):
+        # clearing the element isn't enough with lxml; drop already-read siblings too so the tree stays flat
+        result_id = str(elem.text)
+        elem.clear()
+        while elem.getprevious() is not None:
+            del elem.getparent()[0]
+        return result_id
 
-    def get_query_result(self, job_id, batch_id, result_id):
+    def get_query_result(self, job_id, batch_id, result_id, as_table=False):
 
         self._logger.debug("Downloading result id %s..." % (result_id))
 
         url = self.endpoint + "/job/%s/batch/%s/result/%s" % (job_id, batch_id, result_id)
-        req = requests.get(url, headers=self.headers())
-        self.check_status(req.status_code, req.text)
+        result = self.read_csv(url, as_table)
 
         self._logger.debug("Download complete.")
 
-        result = pd.read_csv(StringIO(req.text))
         return(result)
 
     def get_all_query_results(self, job_id):
         batch_id = self.batches[job_id][0]
         result_ids = self.get_result_ids_for_query(job_id)
-        results = [self.get_query_result(job_id, batch_id, result_id) for result_id in result_ids]
+        results = list(self._executor.map(lambda result_id: self.get_query_result(job_id, batch_id, result_id, pyarrow is not None), result_ids))
 
-        job_status = self.get_status(job_id, 'job')
         self._logger.debug("=====")
-        self._logger.debug("Results summary for job id %s:" % (job_id))
-        for k, v in job_status.items():
-            self._logger.debug('    %s: %s' % (k, v))
-
-        return pd.concat(results, axis=0)
+        self.log_status('job', job_id, self.get_status(job_id, 'job', reload=True))
+
+        return self.concat_results(results)
+
+    def csv_blocks(self, df_chunk, block_size=1000):
+        # encode and gzip a chunk a block of rows at a time so its full CSV is never held in memory;
+        # a fast compression level is far cheaper than the upload it saves
+        compressor = zlib.compressobj(1, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+        for i in range(0, len(df_chunk), block_size):
+            block = df_chunk.iloc[i:i+block_size].to_csv(index=False, header=(i == 0), lineterminator='\n')
+            data = compressor.compress(block.encode('UTF-8'))
+            if data:
+                yield data
+        yield compressor.flush()
+
+    def add_csv_batch(self, url, df_chunk):
+        # requests sends a generator body with chunked transfer encoding as it is produced
+        req = self._session.post(url, headers=self.headers({"Content-Type": "text/csv; charset=UTF-8", "Content-Encoding": "gzip"}), data=self.csv_blocks(df_chunk))
+        self.check_status(req.status_code, req.text)
+        return req.content
 
     def bulk_csv_operation(self, job_id, in_df, close_job=True):
         url = self.endpoint + "/job/%s/batch" % job_id
-        num_batches = 0
-
-        for df_chunk in self.df_chunks(in_df):
-
-            num_batches += 1
-
-            buf = StringIO(newline='\n')
-            df_chunk.to_csv(buf, index=False)
-            buf.seek(0)
-
-            req = requests.post(url, headers=self.headers({"Content-Type": "text/csv; charset=UTF-8"}), data=buf.read().encode('UTF-8'))
-            self.check_status(req.status_code, req.text)
 
-            tree = ET.fromstring(req.text)
-            batch_id = tree.findtext("{%s}id" % self.jobNS)
+        chunks = list(self.df_chunks(in_df))
 
-            self._logger.debug("Added batch id %s (#%s) to job id %s..." % (batch_id, num_batches, job_id))
-
-            self.batches[job_id].append(batch_id)
+        futures = []
+        contents = []
+        try:
+            if job_id in self._serial_jobs:
+                # serial jobs process batches in the order the server creates them, so post them one at a time
+                for df_chunk in chunks:
+                    contents.append(self.add_csv_batch(url, df_chunk))
+            else:
+                # otherwise batches are independent until the job is closed, so serialize and post them concurrently
+                futures = [self._executor.submit(self.add_csv_batch, url, df_chunk) for df_chunk in chunks]
+                for future in futures:
+                    contents.append(future.result())
+        except Exception:
+            # stop posting, keep track of the batches the job already accepted, and abort it
+            for future in futures:
+                future.cancel()
+            contents += [f.result() for f in futures[len(contents)+1:] if not f.cancelled() and f.exception() is None]
+            self.register_batches(job_id, contents)
+            self.abort_job(job_id)
+            raise
+
+        self.register_batches(job_id, contents)
 
         if close_job:
             self.close_job(job_id)
 
         return self.batches[job_id]
 
-    def get_bulk_csv_operation_result(self, job_id, batch_id):
+    def get_bulk_csv_operation_result(self, job_id, batch_id, as_table=False):
 
         self._logger.debug("Downloading results for batch id %s..." % (batch_id))
 
-        batch_status = self.get_status(batch_id, 'batch')
-        self._logger.debug("Results summary for batch id %s:" % (batch_id))
-        for k, v in batch_status.items():
-            self._logger.debug('    %s: %s' % (k, v))
+        self.log_status('batch', batch_id, self.get_status(batch_id, 'batch'))
 
         url = self.endpoint + "/job/%s/batch/%s/result" % (job_id, batch_id)
-        req = requests.get(url, headers=self.headers())
-        self.check_status(req.status_code, req.text)
+        result = self.read_csv(url, as_table)
 
         self._logger.debug("Download complete.")
 
-        result = pd.read_csv(StringIO(req.text))
         return result
 
     def get_bulk_csv_operation_results(self, job_id):
 
         self.wait_for_job(job_id)
-        results = [self.get_bulk_csv_operation_result(job_id, batch_id) for batch_id in self.batches[job_id]]
+        results = list(self._executor.map(lambda batch_id: self.get_bulk_csv_operation_result(job_id, batch_id, pyarrow is not None), self.batches[job_id]))
 
-        job_status = self.get_status(job_id, 'job')
         self._logger.debug("=====")
-        self._logger.debug("Results summary for job id %s:" % (job_id))
-        for k, v in job_status.items():
-            self._logger.debug('    %s: %s' % (k, v))
+        self.log_status('job', job_id, self.get_status(job_id, 'job', reload=True))
 
-        return pd.concat(results, axis=0)
+        return self.concat_results(results)
@@ -0,0 +1,236 @@
+import time, asyncio, httpx
+from io import BytesIO
+
+from sfdc_bulk.api import (
+    FROM_RE,
+    ET,
+    pyarrow,
+    SalesforceBulkAPI
+)
+
+
+# asyncio flavour of SalesforceBulkAPI: every method that talks to the bulk API is a coroutine,
+# and polls/downloads are multiplexed over one HTTP/2 connection pool instead of a thread pool;
+# everything that doesn't do I/O is shared with the sync client
+class AsyncSalesforceBulkAPI(SalesforceBulkAPI):
+
+    def open_session(self, max_workers):
+        transport = httpx.AsyncHTTPTransport(http2=True, retries=3, limits=httpx.Limits(max_connections=32))
+        # no timeout, like the requests client: large downloads/uploads and calls queued for a connection can take a while
+        self._client = httpx.AsyncClient(transport=transport, timeout=None, headers={"X-SFDC-Session": self.session_id, "Accept-Encoding": "gzip"})
+
+        # result files are held in memory until parsed, so bound how many are downloaded at once
+        self._downloads = asyncio.Semaphore(max_workers)
+
+    async def close(self):
+        await self._client.aclose()
+
+    def __enter__(self):
+        raise TypeError("AsyncSalesforceBulkAPI must be used with 'async with', not 'with'")
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        raise TypeError("AsyncSalesforceBulkAPI must be used with 'async with', not 'with'")
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self.close()
+
+    async def read_csv(self, url, as_table=False):
+        async with self._downloads:
+            req = await self._client.get(url, headers=self.headers())
+            if req.status_code >= 400:
+                self.check_status(req.status_code, req.text)
+
+            # parsing is CPU bound, so keep it off the event loop
+            return await asyncio.to_thread(self.parse_csv, BytesIO(req.content), as_table)
+
+    # some methods for monitoring jobs
+    async def get_status(self, obj_id, obj_type='job', reload=False):
+        status = self.cached_status(obj_id, obj_type, reload)
+        if status is not None:
+            return status
+
+        req = await self._client.get(self.status_url(obj_id, obj_type), headers=self.headers())
+        self.check_status(req.status_code, req.text)
+
+        return self.store_status(obj_id, obj_type, req.content)
+
+    async def is_batch_done(self, batch_id):
+        if batch_id in self._done_batches:
+            self._logger.debug("Batch id %s completed previously." % (batch_id))
+            return True
+
+        return self.check_batch_state(batch_id, await self.get_status(batch_id, 'batch', reload=True))
+
+    async def is_job_done(self, job_id):
+        results = await asyncio.gather(*(self.is_batch_done(batch_id) for batch_id in self.pending_batch_ids(job_id)))
+        return all(results)
+
+    async def wait(self, is_done, job_id, timeout, initial_interval, max_interval):
+        start = time.monotonic()
+        attempt = 0
+        last_pending = None
+        while not await is_done() and time.monotonic() - start < timeout:
+            pending = self.pending_batches(job_id)
+            attempt, interval = self.backoff(attempt, pending, last_pending, initial_interval, max_interval)
+            last_pending = pending
+            await asyncio.sleep(interval)
+
+    async def wait_for_batch(self, batch_id, timeout=60*10, initial_interval=2, max_interval=30, sleep_interval=None):
+        initial_interval = self.resolve_initial_interval(initial_interval, sleep_interval)
+        await self.wait(lambda: self.is_batch_done(batch_id), self.lookup_job_id(batch_id), timeout, initial_interval, max_interval)
+
+    async def wait_for_job(self, job_id, timeout=60*60, initial_interval=2, max_interval=30, sleep_interval=None):
+        initial_interval = self.resolve_initial_interval(initial_interval, sleep_interval)
+        await self.wait(lambda: self.is_job_done(job_id), job_id, timeout, initial_interval, max_interval)
+
+
+    # makes a job (query, insert, upsert, update, or delete); the create_*_job shortcuts return this coroutine
+    async def create_job(self, **kwargs):
+        req = await self._client.post(self.endpoint + "/job", headers=self.headers(), content=self.new_job_doc(**kwargs))
+        self.check_status(req.status_code, req.text)
+
+        return self.add_job(req.content, **kwargs)
+
+
+    # closes a job
+    async def close_job(self, job_id):
+        url = self.endpoint + "/job/%s" % job_id
+        req = await self._client.post(url, headers=self.headers(), content=self.create_job_doc(state='Closed'))
+        self.check_status(req.status_code, req.text)
+
+        self._logger.debug("Closed job id %s." % (job_id))
+
+    # aborts a job
+    async def abort_job(self, job_id):
+        url = self.endpoint + "/job/%s" % job_id
+        req = await self._client.post(url, headers=self.headers(), content=self.create_job_doc(state='Aborted'))
+        self.check_status(req.status_code, req.text)
+
+        self._logger.debug("Aborted job id %s." % (job_id))
+
+
+    # methods for running a query and downloading the results
+    async def query(self, soql):
+
+        self._logger.debug("SOQL query to execute: %s" % (soql))
+
+        job_id = await self.create_query_job(object=FROM_RE.search(soql).group(1), contentType='CSV')
+
+        url = self.endpoint + "/job/%s/batch" % job_id
+        req = await self._client.post(url, headers=self.headers({"Content-Type": "text/csv; charset=UTF-8"}), content=soql)
+        self.check_status(req.status_code, req.text)
+
+        self.register_batches(job_id, [req.content])
+
+        await self.close_job(job_id) # can close it out (no more batches being added)
+
+        return job_id
+
+    async def get_result_ids_for_query(self, job_id):
+        batch_id = self.batches[job_id][0]
+        await self.wait_for_batch(batch_id)
+
+        url = self.endpoint + "/job/%s/batch/%s/result" % (job_id, batch_id)
+
+        # parse result ids incrementally so downloads can start before the whole list is read
+        async with self._client.stream("GET", url, headers=self.headers()) as req:
+            if req.status_code >= 400:
+                await req.aread()
+                self.check_status(req.status_code, req.text)
+
+            parser = ET.XMLPullParser(events=("end",), tag="{%s}result" % self.jobNS)
+            async for chunk in req.aiter_bytes():
+                parser.feed(chunk)
+                for event, elem in parser.read_events():
+                    result_id = self.pop_result_id(elem)
+                    self._logger.debug("Query result id %s." % (result_id))
+                    yield result_id
+
+    async def get_query_result(self, job_id, batch_id, result_id, as_table=False):
+
+        self._logger.debug("Downloading result id %s..." % (result_id))
+
+        url = self.endpoint + "/job/%s/batch/%s/result/%s" % (job_id, batch_id, result_id)
+        result = await self.read_csv(url, as_table)
+
+        self._logger.debug("Download complete.")
+
+        return(result)
+
+    async def get_all_query_results(self, job_id):
+        batch_id = self.batches[job_id][0]
+        downloads = [asyncio.ensure_future(self.get_query_result(job_id, batch_id, result_id, pyarrow is not None))
+                     async for result_id in self.get_result_ids_for_query(job_id)]
+        results = await asyncio.gather(*downloads)
+
+        self._logger.debug("=====")
+        self.log_status('job', job_id, await self.get_status(job_id, 'job', reload=True))
+
+        return self.concat_results(results)
+
+    async def add_csv_batch(self, url, df_chunk):
+        # httpx can't stream a sync generator from an async client, so join the blocks off the event loop
+        data = await asyncio.to_thread(lambda: b''.join(self.csv_blocks(df_chunk)))
+
+        req = await self._client.post(url, headers=self.headers({"Content-Type": "text/csv; charset=UTF-8", "Content-Encoding": "gzip"}), content=data)
+        self.check_status(req.status_code, req.text)
+        return req.content
+
+    async def bulk_csv_operation(self, job_id, in_df, close_job=True):
+        url = self.endpoint + "/job/%s/batch" % job_id
+
+        chunks = list(self.df_chunks(in_df))
+
+        tasks = []
+        contents = []
+        try:
+            if job_id in self._serial_jobs:
+                # serial jobs process batches in the order the server creates them, so post them one at a time
+                for df_chunk in chunks:
+                    contents.append(await self.add_csv_batch(url, df_chunk))
+            else:
+                # otherwise batches are independent until the job is closed, so serialize and post them concurrently
+                tasks = [asyncio.ensure_future(self.add_csv_batch(url, df_chunk)) for df_chunk in chunks]
+                contents = list(await asyncio.gather(*tasks))
+        except Exception:
+            # stop posting, keep track of the batches the job already accepted, and abort it
+            for task in tasks:
+                task.cancel()
+            done = await asyncio.gather(*tasks, return_exceptions=True)
+            contents += [content for content in done if isinstance(content, bytes)]
+            self.register_batches(job_id, contents)
+            await self.abort_job(job_id)
+            raise
+
+        self.register_batches(job_id, contents)
+
+        if close_job:
+            await self.close_job(job_id)
+
+        return self.batches[job_id]
+
+    async def get_bulk_csv_operation_result(self, job_id, batch_id, as_table=False):
+
+        self._logger.debug("Downloading results for batch id %s..." % (batch_id))
+
+        self.log_status('batch', batch_id, await self.get_status(batch_id, 'batch'))
+
+        url = self.endpoint + "/job/%s/batch/%s/result" % (job_id, batch_id)
+        result = await self.read_csv(url, as_table)
+
+        self._logger.debug("Download complete.")
+
+        return result
+
+    async def get_bulk_csv_operation_results(self, job_id):
+
+        await self.wait_for_job(job_id)
+        results = await asyncio.gather(*(self.get_bulk_csv_operation_result(job_id, batch_id, pyarrow is not None) for batch_id in self.batches[job_id]))
+
+        self._logger.debug("=====")
+        self.log_status('job', job_id, await self.get_status(job_id, 'job', reload=True))
+
+        return self.concat_results(results)
@@ -0,0 +1,211 @@
+import time, logging, threading
+import pandas as pd
+import pytest
+from concurrent.futures import ThreadPoolExecutor
+
+from sfdc_bulk import SalesforceBulkAPI
+
+
+@pytest.fixture
+def bulk():
+    # skip __init__, which logs in to Salesforce; tests stub out anything that would touch the network
+    api = SalesforceBulkAPI.__new__(SalesforceBulkAPI)
+    api.endpoint = 'https://na1-api.salesforce.com/services/async/37.0'
+    api.batch_size = 3
+    api.jobs = []
+    api.job_statuses = {}
+    api.batches = {}
+    api.batch_statuses = {}
+    api._batch_to_job = {}
+    api._done_batches = set()
+    api._serial_jobs = set()
+    api._lock = threading.Lock()
+    api._executor = ThreadPoolExecutor(max_workers=2)
+    api._logger = logging.getLogger('sfdc_bulk.tests')
+    yield api
+    api._executor.shutdown()
+
+
+def batch_info(batch_id, state=None):
+    xml = '<batchInfo xmlns="%s"><id>%s</id>' % (SalesforceBulkAPI.jobNS, batch_id)
+    if state:
+        xml += '<state>%s</state>' % state
+    return (xml + '</batchInfo>').encode()
+
+
+def test_df_chunks_exact_multiple(bulk):
+    df = pd.DataFrame({'a': range(6)})
+    chunks = list(bulk.df_chunks(df))
+    assert [c['a'].tolist() for c in chunks] == [[0, 1, 2], [3, 4, 5]]
+
+
+def test_df_chunks_remainder(bulk):
+    df = pd.DataFrame({'a': range(7)})
+    chunks = list(bulk.df_chunks(df))
+    assert [len(c) for c in chunks] == [3, 3, 1]
+
+
+def test_df_chunks_non_range_index(bulk):
+    df = pd.DataFrame({'a': range(5)}, index=[10, 3, 7, 0, 1])
+    chunks = list(bulk.df_chunks(df))
+    assert [c.index.tolist() for c in chunks] == [[10, 3, 7], [0, 1]]
+    assert pd.concat(chunks)['a'].tolist() == list(range(5))
+
+
+def test_df_chunks_empty(bulk):
+    with pytest.raises(ValueError):
+        list(bulk.df_chunks(pd.DataFrame({'a': []})))
+
+
+def test_create_job_doc_orders_params(bulk):
+    doc = bulk.create_job_doc(contentType='CSV', externalIdFieldName='Ext__c', object='Lead', operation='upsert', extra='x')
+    assert doc == (b'<?xml version="1.0" encoding="UTF-8"?>'
+                   b'<jobInfo xmlns="http://www.force.com/2009/06/asyncapi/dataload">'
+                   b'<operation>upsert</operation><object>Lead</object><externalIdFieldName>Ext__c</externalIdFieldName>'
+                   b'<contentType>CSV</contentType><extra>x</extra></jobInfo>')
+
+
+def test_create_job_doc_escapes_values(bulk):
+    doc = bulk.create_job_doc(operation='insert', object='A&B<C>')
+    assert b'<object>A&amp;B&lt;C&gt;</object>' in doc
+
+
+@pytest.mark.parametrize('operation', ['query', 'queryAll', 'insert', 'upsert', 'update', 'delete', 'hardDelete'])
+def test_create_job_doc_accepts_operations(bulk, operation):
+    assert b'<operation>%s</operation>' % operation.encode() in bulk.create_job_doc(operation=operation, object='Lead')
+
+
+def test_create_job_doc_rejects_unknown_operation(bulk):
+    with pytest.raises(ValueError):
+        bulk.create_job_doc(operation='merge', object='Lead')
+
+
+def test_create_job_doc_rejects_unknown_state(bulk):
+    with pytest.raises(ValueError):
+        bulk.create_job_doc(state='Bogus')
+
+
+def test_bulk_csv_operation_failure_registers_accepted_batches_and_aborts(bulk):
+    bulk.batches['J1'] = []
+    aborted = []
+
+    def add_csv_batch(url, df_chunk):
+        first = df_chunk['a'].iloc[0]
+        if first == 3:
+            raise RuntimeError('batch rejected')
+        return batch_info('B%s' % first)
+
+    bulk.add_csv_batch = add_csv_batch
+    bulk.abort_job = aborted.append
+    bulk.close_job = lambda job_id: pytest.fail('job should not be closed')
+
+    with pytest.raises(RuntimeError, match='batch rejected'):
+        bulk.bulk_csv_operation('J1', pd.DataFrame({'a': range(9)}))
+
+    assert 'B0' in bulk.batches['J1']
+    assert 'B3' not in bulk.batches['J1']
+    assert bulk.lookup_job_id('B0') == 'J1'
+    assert aborted == ['J1']
+
+
+def test_bulk_csv_operation_posts_serial_jobs_one_at_a_time(bulk):
+    bulk.batches['J1'] = []
+    bulk._serial_jobs.add('J1')
+    posted = []
+    active = [0, 0]  # in flight, max in flight
+
+    def add_csv_batch(url, df_chunk):
+        active[0] += 1
+        active[1] = max(active)
+        time.sleep(0.01)
+        posted.append(df_chunk['a'].iloc[0])
+        active[0] -= 1
+        return batch_info('B%s' % posted[-1])
+
+    bulk.add_csv_batch = add_csv_batch
+    bulk.close_job = lambda job_id: None
+
+    assert bulk.bulk_csv_operation('J1', pd.DataFrame({'a': range(9)})) == ['B0', 'B3', 'B6']
+    assert posted == [0, 3, 6]
+    assert active[1] == 1
+
+
+class FakeSession(object):
+
+    def __init__(self, *contents):
+        self.contents = list(contents)
+        self.urls = []
+
+    def get(self, url, headers=None):
+        self.urls.append(url)
+        content = self.contents.pop(0)
+        return type('Response', (), {'status_code': 200, 'text': content.decode(), 'content': content})()
+
+
+def test_get_status_caches_batches_under_batch_statuses(bulk):
+    bulk.batches['J1'] = []
+    bulk.add_batches('J1', ['B1'])
+    bulk._session = FakeSession(batch_info('B1', 'InProgress'))
+
+    assert bulk.get_status('B1', 'batch')['state'] == 'InProgress'
+    assert bulk.batch_statuses['B1']['state'] == 'InProgress'
+    assert 'B1' not in bulk.job_statuses
+    assert bulk._session.urls == [bulk.endpoint + '/job/J1/batch/B1']
+
+
+def test_get_status_skips_reload_for_completed_batches(bulk):
+    bulk.batches['J1'] = []
+    bulk.add_batches('J1', ['B1'])
+    bulk._session = FakeSession(batch_info('B1', 'Completed'))
+
+    bulk.get_status('B1', 'batch', reload=True)
+    assert bulk.get_status('B1', 'batch', reload=True)['state'] == 'Completed'
+    assert len(bulk._session.urls) == 1
+
+
+def test_get_status_reloads_pending_batches(bulk):
+    bulk.batches['J1'] = []
+    bulk.add_batches('J1', ['B1'])
+    bulk._session = FakeSession(batch_info('B1', 'Queued'), batch_info('B1', 'Completed'))
+
+    assert bulk.get_status('B1', 'batch', reload=True)['state'] == 'Queued'
+    assert bulk.get_status('B1', 'batch', reload=True)['state'] == 'Completed'
+    assert len(bulk._session.urls) == 2
+
+
+def test_pop_result_id_drops_processed_results(bulk):
+    from io import BytesIO
+    from sfdc_bulk.api import ET
+
+    xml = '<result-list xmlns="%s">%s</result-list>' % (SalesforceBulkAPI.jobNS, ''.join('<result>r%s</result>' % i for i in range(5)))
+    result_ids = []
+    for event, elem in ET.iterparse(BytesIO(xml.encode()), events=("end",), tag="{%s}result" % SalesforceBulkAPI.jobNS):
+        result_ids.append(bulk.pop_result_id(elem))
+        assert elem.getprevious() is None
+
+    assert result_ids == ['r0', 'r1', 'r2', 'r3', 'r4']
+
+
+def test_concat_results_with_mismatched_types(bulk):
+    pyarrow = pytest.importorskip('pyarrow')
+    import pyarrow.csv
+    from io import BytesIO
+
+    first = pyarrow.csv.read_csv(BytesIO(b'Id,PostalCode\n1,60601\n'))
+    second = pyarrow.csv.read_csv(BytesIO(b'Id,PostalCode\n2,SW1A 1AA\n'))
+    assert first.schema.field('PostalCode').type != second.schema.field('PostalCode').type
+
+    df = bulk.concat_results([first, second])
+    assert df['Id'].tolist() == [1, 2]
+    assert [str(v) for v in df['PostalCode']] == ['60601', 'SW1A 1AA']
+
+
+def test_csv_blocks_round_trips_across_block_boundaries(bulk):
+    import gzip
+
+    df = pd.DataFrame({'Id': range(5), 'Name': ['a', 'b', 'c', 'd', 'e']})
+    csv = gzip.decompress(b''.join(bulk.csv_blocks(df, block_size=2))).decode()
+
+    assert csv == df.to_csv(index=False, lineterminator='\n')
+    assert csv.count('Id,Name') == 1
+    assert len(csv.splitlines()) == 6